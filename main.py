@@ -19,15 +19,82 @@
 """
 
 import argparse
+import io
+import mmap
+import operator
 import os
 import sys
+from array import array
 from collections import defaultdict
-from typing import List, Dict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, redirect_stdout
+from dataclasses import dataclass, field
+from itertools import chain, groupby
+from typing import BinaryIO, Callable, List, Dict, Iterable, Iterator, Optional, Tuple, TypeVar
 
 # Константы
 REQUIRED_COLUMNS = ['id', 'email', 'name', 'department', 'hours_worked']
 RATE_COLUMNS = {'hourly_rate', 'rate', 'salary'}
 CSV_SEPARATOR = ','
+WARNING_BATCH_SIZE = 1000
+RATE_CACHE_SIZE = 4096
+
+T = TypeVar('T')
+
+
+@dataclass
+class Records:
+    """
+    Проверенные записи в столбцовом виде (структура массивов).
+
+    Числовые столбцы хранятся в непрерывных массивах array('d'), отдел кодируется
+    целым числом — индексом в словаре departments.
+    """
+    names: List[str] = field(default_factory=list)
+    dept_codes: array = field(default_factory=lambda: array('i'))
+    hours: array = field(default_factory=lambda: array('d'))
+    rate: array = field(default_factory=lambda: array('d'))
+    payout: array = field(default_factory=lambda: array('d'))
+    departments: List[str] = field(default_factory=list)
+    _dept_index: Dict[str, int] = field(default_factory=dict, repr=False, compare=False)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def department_code(self, department: str) -> int:
+        """
+        Возвращает код отдела, при необходимости добавляя его в словарь.
+        """
+        code = self._dept_index.get(department)
+        if code is None:
+            code = self._dept_index[department] = len(self.departments)
+            self.departments.append(department)
+        return code
+
+    def groups(self) -> Iterator[Tuple[str, List[int]]]:
+        """
+        Группирует индексы строк по отделам.
+
+        Отделы идут в порядке первого появления, строки внутри отдела - в исходном порядке.
+
+        Возвращает:
+            Итератор пар (отдел, индексы его строк)
+        """
+        code_of = self.dept_codes.__getitem__
+        order = sorted(range(len(self)), key=code_of)
+        for code, rows in groupby(order, key=code_of):
+            yield self.departments[code], list(rows)
+
+    def extend(self, other: 'Records') -> None:
+        """
+        Добавляет записи другого набора, перекодируя его отделы в свой словарь.
+        """
+        recode = [self.department_code(dept) for dept in other.departments]
+        self.names.extend(other.names)
+        self.dept_codes.extend(recode[code] for code in other.dept_codes)
+        self.hours.extend(other.hours)
+        self.rate.extend(other.rate)
+        self.payout.extend(other.payout)
 
 
 def parse_arguments() -> argparse.Namespace:
@@ -56,156 +123,334 @@ def parse_arguments() -> argparse.Namespace:
     return parser.parse_args()
 
 
-def form_records(rows: List[Dict[str, str]], rate_column: str) -> List[Dict[str, object]]:
+def _write_batch(messages: List[str]) -> None:
+    """
+    Выводит накопленные строки одной операцией записи в stdout.
+
+    Аргументы:
+        messages: Строки вывода без завершающего перевода строки
+    """
+    if messages:
+        sys.stdout.write('\n'.join(messages) + '\n')
+
+
+def iter_valid_rows(rows: Iterable[List[bytes]], idx: Tuple[int, int, int, int]) -> Iterator[Tuple[str, str, float, float]]:
+    """
+    Лениво разбирает и валидирует строки CSV.
+
+    Аргументы:
+        rows: Строки как списки сырых байтовых полей
+        idx: Позиции столбцов (name, department, hours_worked, ставка) в строке
+
+    Возвращает:
+        Итератор кортежей (имя, отдел, часы, ставка) для корректных строк
+    """
+    pick = operator.itemgetter(*idx)
+    skipped = []
+    rate_cache: Dict[bytes, float] = {}
+    dept_cache: Dict[bytes, str] = {}
+    try:
+        for line_number, parts in enumerate(rows, 2):
+            try:
+                raw_name, raw_department, raw_hours, raw_rate = pick(parts)
+                name = raw_name.decode('utf-8').strip()
+                department = dept_cache.get(raw_department)
+                if department is None:
+                    department = dept_cache[raw_department] = raw_department.decode('utf-8').strip()
+                hours = float(raw_hours)
+                rate = rate_cache.get(raw_rate)
+                if rate is None:
+                    rate = float(raw_rate)
+                    if len(rate_cache) < RATE_CACHE_SIZE:
+                        rate_cache[raw_rate] = rate
+            except (ValueError, IndexError):
+                skipped.append(f"Строка {line_number} содержит некорректные данные. Пропуск.")
+                if len(skipped) >= WARNING_BATCH_SIZE:
+                    _write_batch(skipped)
+                    skipped.clear()
+                continue
+
+            if not name or not department or hours < 0 or rate < 0:
+                continue
+
+            yield name, department, hours, rate
+    finally:
+        _write_batch(skipped)
+
+
+def form_records(rows: Iterable[List[bytes]], idx: Tuple[int, int, int, int]) -> Records:
     """
     Формирует и валидирует записи из исходных строк CSV.
 
     Аргументы:
-        rows: Список строк как словарей (заголовок -> значение)
-        rate_column: Имя столбца с почасовой ставкой
+        rows: Строки как списки сырых байтовых полей
+        idx: Позиции столбцов (name, department, hours_worked, ставка) в строке
 
     Возвращает:
-        Список проверенных записей с расчетом выплат
+        Проверенные записи в столбцовом виде с расчетом выплат
     """
-    records = []
-    hours_list = []
-    payouts = []
+    records = Records()
 
-    for line_number, parts in enumerate(rows, 2):
-        try:
-            name = parts['name'].strip()
-            department = parts['department'].strip()
-            hours = float(parts['hours_worked'])
-            rate = float(parts[rate_column])
-        except (ValueError, KeyError):
-            print(f"Строка {line_number} содержит некорректные данные. Пропуск.")
-            continue
-
-        if not name or not department or hours < 0 or rate < 0:
-            continue
-
-        payout = hours * rate
-        hours_list.append(hours)
-        payouts.append(payout)
-
-        records.append({
-            'name': name,
-            'department': department,
-            'hours': hours,
-            'rate': rate,
-            'payout': payout
-        })
-
-    # Пример других метрик для потенциального расширения функционала
-    if payouts:
-        mean_payout = sum(payouts) / len(payouts)
-        max_hours = max(hours_list)
-        _ = mean_payout, max_hours
+    add_name = records.names.append
+    add_code = records.dept_codes.append
+    add_hours = records.hours.append
+    add_rate = records.rate.append
+    department_code = records.department_code
+
+    for name, department, hours, rate in iter_valid_rows(rows, idx):
+        add_name(name)
+        add_code(department_code(department))
+        add_hours(hours)
+        add_rate(rate)
+
+    records.payout = array('d', map(operator.mul, records.hours, records.rate))
 
     return records
 
 
-def read_and_validate_file(filepath: str, valid_rate_keys: set[str]) -> List[Dict[str, object]]:
+def _read_chunked_lines(f: BinaryIO, bufsize: int = 1 << 20) -> Iterator[bytes]:
     """
-    Читает CSV-файл и проверяет его структуру и данные.
+    Читает файл блоками и отдает строки вместе с завершающим переводом строки.
+
+    Аргументы:
+        f: Файл, открытый в двоичном режиме
+        bufsize: Размер читаемого блока в байтах
+
+    Возвращает:
+        Итератор строк файла
+    """
+    tail = b''
+    while True:
+        data = f.read1(bufsize)
+        if not data:
+            if tail:
+                yield tail
+            return
+        lines = (tail + data).splitlines(keepends=True)
+        # '\r' в конце блока может оказаться началом '\r\n'
+        tail = b'' if lines[-1].endswith(b'\n') else lines.pop()
+        yield from lines
+
+
+@contextmanager
+def _open_lines(f: BinaryIO) -> Iterator[Iterator[bytes]]:
+    """
+    Отдает ленивый итератор по строкам открытого файла.
+
+    Обычные файлы отображаются в память через mmap; если это невозможно (пустой файл,
+    канал, устройство), файл читается блоками. Как и текстовый режим open(), принимает
+    окончания строк LF, CRLF и CR.
+
+    Аргументы:
+        f: Файл, открытый в двоичном режиме
+
+    Возвращает:
+        Итератор строк файла без завершающего перевода строки
+    """
+    try:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (ValueError, OSError):
+        mm = None
+
+    if mm is None:
+        yield chain.from_iterable(map(bytes.splitlines, _read_chunked_lines(f)))
+        return
+
+    with mm:
+        yield chain.from_iterable(map(bytes.splitlines, iter(mm.readline, b'')))
+
+
+@contextmanager
+def _open_rows(filepath: str, valid_rate_keys: set[str]) -> Iterator[Tuple[Iterator[List[bytes]], Tuple[int, int, int, int]]]:
+    """
+    Открывает CSV-файл, проверяет заголовок и отдает ленивый итератор по его строкам.
 
     Аргументы:
         filepath: Путь к CSV-файлу
         valid_rate_keys: Допустимые имена столбцов с оплатой
 
     Возвращает:
-        Список валидированных записей
+        Пару (итератор строк как списков полей, позиции нужных столбцов)
     """
     if not os.path.exists(filepath):
         raise FileNotFoundError(f"Файл не найден: {filepath}")
 
-    with open(filepath, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
+    with open(filepath, 'rb') as f, _open_lines(f) as lines:
+        header_line = next(lines, None)
+        if header_line is None:
+            yield iter(()), (0, 0, 0, 0)
+            return
+
+        header = header_line.decode('utf-8').strip().split(CSV_SEPARATOR)
+
+        header_idx = {col: i for i, col in enumerate(header)}
+
+        missing = [col for col in REQUIRED_COLUMNS if col not in header_idx]
+        if missing:
+            raise ValueError(f"Отсутствует обязательный столбец '{missing[0]}' в файле {filepath}")
+
+        rate_column = next(iter(valid_rate_keys & header_idx.keys()), None)
+        if not rate_column:
+            raise ValueError(f"Отсутствует столбец со ставкой из набора {valid_rate_keys} в файле {filepath}")
+
+        idx = (header_idx['name'], header_idx['department'], header_idx['hours_worked'],
+               header_idx[rate_column])
+
+        def split_rows() -> Iterator[List[bytes]]:
+            separator = CSV_SEPARATOR.encode('utf-8')
+            n_separators = len(header) - 1
+            # Поля после последнего нужного столбца не разделяются
+            maxsplit = max(idx) + 1
+            mismatched = []
+            try:
+                for line_number, line in enumerate(lines, 2):
+                    line = line.strip()
+                    if line.count(separator) != n_separators:
+                        mismatched.append(f"Пропуск строки {line_number} в {filepath}: количество столбцов не совпадает.")
+                        if len(mismatched) >= WARNING_BATCH_SIZE:
+                            _write_batch(mismatched)
+                            mismatched.clear()
+                        continue
+                    yield line.split(separator, maxsplit)
+            finally:
+                _write_batch(mismatched)
+
+        yield split_rows(), idx
+
+
+def read_and_validate_file(filepath: str, valid_rate_keys: set[str]) -> Records:
+    """
+    Читает CSV-файл и проверяет его структуру и данные.
 
-    if not lines:
-        return []
+    Аргументы:
+        filepath: Путь к CSV-файлу
+        valid_rate_keys: Допустимые имена столбцов с оплатой
 
-    header = lines[0].strip().split(CSV_SEPARATOR)
+    Возвращает:
+        Валидированные записи в столбцовом виде
+    """
+    with _open_rows(filepath, valid_rate_keys) as (rows, idx):
+        return form_records(rows, idx)
 
-    for col in REQUIRED_COLUMNS:
-        if col not in header:
-            raise ValueError(f"Отсутствует обязательный столбец '{col}' в файле {filepath}")
 
-    rate_column = next((col for col in valid_rate_keys if col in header), None)
-    if not rate_column:
-        raise ValueError(f"Отсутствует столбец со ставкой из набора {valid_rate_keys} в файле {filepath}")
+def aggregate_file_rates(filepath: str, valid_rate_keys: set[str]) -> Tuple[Dict[str, float], Dict[str, int]]:
+    """
+    Потоково считает сумму и количество ставок по отделам, не сохраняя сами записи.
 
-    mapped_rows = []
-    for line_number, line in enumerate(lines[1:], 2):
-        parts = line.strip().split(CSV_SEPARATOR)
-        if len(parts) != len(header):
-            print(f"Пропуск строки {line_number} в {filepath}: количество столбцов не совпадает.")
-            continue
-        mapped = dict(zip(header, parts))
-        mapped_rows.append(mapped)
+    Аргументы:
+        filepath: Путь к CSV-файлу
+        valid_rate_keys: Допустимые имена столбцов с оплатой
 
-    return form_records(mapped_rows, rate_column)
+    Возвращает:
+        Пару словарей (отдел -> сумма ставок, отдел -> количество сотрудников)
+    """
+    sums = defaultdict(float)
+    counts = defaultdict(int)
+    with _open_rows(filepath, valid_rate_keys) as (rows, idx):
+        for _, department, _, rate in iter_valid_rows(rows, idx):
+            sums[department] += rate
+            counts[department] += 1
+    return sums, counts
 
 
-def generate_payout_report(records: List[Dict[str, object]]) -> None:
+def generate_payout_report(records: Records) -> None:
     """
     Генерирует и выводит отчет по выплатам, сгруппированный по отделам.
 
     Аргументы:
-        records: Список валидированных записей
+        records: Валидированные записи
     """
-    grouped = defaultdict(list)
-    for rec in records:
-        grouped[rec['department']].append(rec)
-
     columns = ['name', 'hours', 'rate', 'payout']
+    names, hours, rate, payout = records.names, records.hours, records.rate, records.payout
 
-    for dept, recs in grouped.items():
-        print(f"\n{dept}")
+    out = []
+    for department, rows in records.groups():
+        out.append("")
+        out.append(department)
 
-        col_widths = {
-            col: max(len(col), *(len(f"{r[col]:.0f}" if isinstance(r[col], float) else str(r[col]))
-                                for r in recs))
-            for col in columns
-        }
+        cells = [(names[i], f"{hours[i]}", f"{rate[i]}", f"${int(payout[i])}") for i in rows]
+        col_widths = [max(len(col), *map(len, values)) for col, values in zip(columns, zip(*cells))]
+        row_format = "\t".join(f"{{:<{width}}}" for width in col_widths)
 
-        header = ""
-        for i, col in enumerate(columns):
-            tab = "\t" if i < len(columns) - 1 else ""
-            header += f"{col:<{col_widths[col]}}" + tab
-        print(header)
+        out.append(row_format.format(*columns))
+        out.append("\t".join("-" * width for width in col_widths))
+        out.extend(row_format.format(*cell) for cell in cells)
 
-        dash_line = ""
-        for i, col in enumerate(columns):
-            tab = "\t" if i < len(columns) - 1 else ""
-            dash_line += "-" * col_widths[col] + tab
-        print(dash_line)
+    _write_batch(out)
 
-        for r in recs:
-            line = ""
-            for i, col in enumerate(columns):
-                value = f"${int(r[col])}" if col == 'payout' else f"{r[col]}"
-                tab = "\t" if i < len(columns) - 1 else ""
-                line += f"{value:<{col_widths[col]}}" + tab
-            print(line)
 
-
-def generate_mean_rate_report(records: List[Dict[str, object]]) -> None:
+def generate_mean_rate_report(sums: Dict[str, float], counts: Dict[str, int]) -> None:
     """
     Генерирует и выводит отчет со средней ставкой по отделам.
 
     Аргументы:
-        records: Список валидированных записей
+        sums: Сумма ставок по отделам
+        counts: Количество сотрудников по отделам
     """
-    rate_data = defaultdict(list)
-    for rec in records:
-        rate_data[rec['department']].append(rec['rate'])
+    out = ["", "Department\tMean Rate", "----------\t---------"]
+    for dept, total in sums.items():
+        count = counts.get(dept, 0)
+        mean = total / count if count else 0
+        out.append(f"{dept:<10}\t{mean:.2f}")
+
+    _write_batch(out)
 
-    print("\nDepartment\tMean Rate")
-    print("----------\t---------")
-    for dept, rates in rate_data.items():
-        mean = sum(rates) / len(rates) if rates else 0
-        print(f"{dept:<10}\t{mean:.2f}")
+
+def _run_captured(func: Callable[[str, set[str]], T], filepath: str) -> Tuple[str, Optional[T], Optional[Exception]]:
+    """
+    Обрабатывает файл в рабочем процессе, перехватывая его вывод в stdout.
+
+    Аргументы:
+        func: Функция обработки файла, принимающая путь и допустимые столбцы ставки
+        filepath: Путь к CSV-файлу
+
+    Возвращает:
+        Тройку (перехваченный вывод, результат func, ошибка обработки)
+    """
+    buffer = io.StringIO()
+    with redirect_stdout(buffer):
+        try:
+            result = func(filepath, RATE_COLUMNS)
+        except Exception as e:
+            return buffer.getvalue(), None, e
+    return buffer.getvalue(), result, None
+
+
+def process_files(func: Callable[[str, set[str]], T], filepaths: List[str]) -> Iterator[T]:
+    """
+    Обрабатывает файлы независимо друг от друга и отдает результаты в порядке файлов.
+
+    Несколько файлов обрабатываются параллельно в отдельных процессах; их предупреждения
+    выводятся в порядке файлов. Ошибка в одном файле выводится в stderr и не прерывает
+    обработку остальных.
+
+    Аргументы:
+        func: Функция обработки файла, принимающая путь и допустимые столбцы ставки
+        filepaths: Пути к CSV-файлам
+
+    Возвращает:
+        Итератор результатов func для успешно обработанных файлов
+    """
+    if len(filepaths) < 2:
+        for filepath in filepaths:
+            try:
+                yield func(filepath, RATE_COLUMNS)
+            except Exception as e:
+                print(f"Ошибка при обработке файла {filepath}: {e}", file=sys.stderr)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(len(filepaths), os.cpu_count() or 1)) as executor:
+        futures = [executor.submit(_run_captured, func, filepath) for filepath in filepaths]
+        for filepath, future in zip(filepaths, futures):
+            try:
+                output, result, error = future.result()
+            except Exception as e:
+                output, result, error = '', None, e
+            sys.stdout.write(output)
+            if error is not None:
+                print(f"Ошибка при обработке файла {filepath}: {error}", file=sys.stderr)
+                continue
+            yield result
 
 
 def main() -> None:
@@ -217,18 +462,19 @@ def main() -> None:
     """
     args = parse_arguments()
 
-    all_records = []
-    for filepath in args.files:
-        try:
-            records = read_and_validate_file(filepath, RATE_COLUMNS)
-            all_records.extend(records)
-        except Exception as e:
-            print(f"Ошибка при обработке файла {filepath}: {e}", file=sys.stderr)
-
     if args.report == 'payout':
+        all_records = Records()
+        for records in process_files(read_and_validate_file, args.files):
+            all_records.extend(records)
         generate_payout_report(all_records)
     elif args.report == 'mean_rate_department':
-        generate_mean_rate_report(all_records)
+        sums = defaultdict(float)
+        counts = defaultdict(int)
+        for file_sums, file_counts in process_files(aggregate_file_rates, args.files):
+            for dept, total in file_sums.items():
+                sums[dept] += total
+                counts[dept] += file_counts[dept]
+        generate_mean_rate_report(sums, counts)
     else:
         print("Тип отчета не реализован. Выберите один из: 'payout', 'mean_rate_department'.", file=sys.stderr)
         sys.exit(1)
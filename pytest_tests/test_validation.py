@@ -9,6 +9,8 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 from main import (
     read_and_validate_file,
+    aggregate_file_rates,
+    iter_valid_rows,
     form_records,
     generate_payout_report,
     generate_mean_rate_report,
@@ -16,6 +18,13 @@ from main import (
 )
 
 
+def make_records(*rows):
+    """
+    Собирает записи из кортежей (имя, отдел, часы, ставка) через form_records.
+    """
+    return form_records([[str(value).encode('utf-8') for value in row] for row in rows], (0, 1, 2, 3))
+
+
 def test_file_with_column_mismatch(tmp_path):
     """
     Проверяет, что строка с неполным количеством столбцов, чем в заголовке, пропускается.
@@ -28,17 +37,80 @@ def test_file_with_column_mismatch(tmp_path):
     )
     records = read_and_validate_file(str(file), RATE_COLUMNS)
     assert len(records) == 1
-    assert records[0]['name'] == 'Bob'
+    assert records.names[0] == 'Bob'
+
+
+def test_file_with_missing_columns(tmp_path):
+    """
+    Проверяет, что отсутствие обязательного столбца или столбца ставки приводит к ошибке.
+    """
+    no_email = tmp_path / "no_email.csv"
+    no_email.write_text("id,name,department,hours_worked,rate\n1,Alice,HR,40,50\n")
+    with pytest.raises(ValueError, match="'email'"):
+        read_and_validate_file(str(no_email), RATE_COLUMNS)
+
+    no_rate = tmp_path / "no_rate.csv"
+    no_rate.write_text("id,email,name,department,hours_worked\n1,test,Alice,HR,40\n")
+    with pytest.raises(ValueError, match="ставкой"):
+        read_and_validate_file(str(no_rate), RATE_COLUMNS)
+
+
+def test_file_with_cr_line_endings(tmp_path):
+    """
+    Проверяет разбор файлов с окончаниями строк '\\r' и '\\r\\n'.
+    """
+    for name, newline in (("cr.csv", "\r"), ("crlf.csv", "\r\n")):
+        file = tmp_path / name
+        file.write_bytes(newline.join([
+            "id,email,name,department,hours_worked,rate",
+            "1,test,Alice,HR,40,50",
+            "2,test,Bob,Sales,35,60",
+            "",
+        ]).encode('utf-8'))
+        records = read_and_validate_file(str(file), RATE_COLUMNS)
+        assert records.names == ['Alice', 'Bob']
+
+
+def test_duplicate_column_uses_last_occurrence(tmp_path):
+    """
+    Проверяет, что при повторе имени столбца в заголовке используется последнее вхождение.
+    """
+    file = tmp_path / "duplicate.csv"
+    file.write_text(
+        "id,email,name,department,hours_worked,rate,rate\n"
+        "1,test,Alice,HR,40,50,99\n"
+    )
+    records = read_and_validate_file(str(file), RATE_COLUMNS)
+    assert list(records.rate) == [99.0]
+    assert list(records.payout) == [3960.0]
+
+
+def test_unused_columns_after_used_ones(tmp_path):
+    """
+    Проверяет файл, где неиспользуемые столбцы идут после нужных: строки с недостающим
+    или лишним полем пропускаются.
+    """
+    file = tmp_path / "trailing.csv"
+    file.write_text(
+        "name,department,hours_worked,rate,id,email\n"
+        "Alice,HR,40,50,1,alice@example.com\n"
+        "Bob,HR,35,60,2\n"
+        "Carol,Sales,30,70,3,carol@example.com,extra\n"
+        "Dave,Sales,20,80,4,dave@example.com\n"
+    )
+    records = read_and_validate_file(str(file), RATE_COLUMNS)
+    assert records.names == ['Alice', 'Dave']
+    assert list(records.payout) == [2000.0, 1600.0]
 
 
 def test_file_with_only_header(tmp_path):
     """
-    Проверяет, что файл с заголовком, но без данных возвращает пустой список.
+    Проверяет, что файл с заголовком, но без данных возвращает пустой набор записей.
     """
     file = tmp_path / "header_only.csv"
     file.write_text("id,email,name,department,hours_worked,rate\n")
     records = read_and_validate_file(str(file), RATE_COLUMNS)
-    assert records == []
+    assert len(records) == 0
 
 
 def test_empty_file(tmp_path):
@@ -48,17 +120,102 @@ def test_empty_file(tmp_path):
     file = tmp_path / "empty.csv"
     file.write_text("")
     records = read_and_validate_file(str(file), RATE_COLUMNS)
-    assert records == []
+    assert len(records) == 0
+
+
+def test_invalid_rows_are_reported(tmp_path, capsys):
+    """
+    Проверяет, что о пропущенных строках с некорректными числами выводятся предупреждения.
+    """
+    file = tmp_path / "invalid.csv"
+    file.write_text(
+        "id,email,name,department,hours_worked,rate\n"
+        "1,test,Alice,HR,forty,50\n"
+        "2,test,Bob,HR,35,abc\n"
+        "3,test,Carol,HR,30,70\n"
+    )
+    records = read_and_validate_file(str(file), RATE_COLUMNS)
+    out = capsys.readouterr().out
+    assert records.names == ['Carol']
+    assert "Строка 2 содержит некорректные данные" in out
+    assert "Строка 3 содержит некорректные данные" in out
+
+
+def test_warnings_flushed_in_batches_and_on_close(monkeypatch, capsys):
+    """
+    Проверяет, что предупреждения выводятся пачками и не теряются при досрочном закрытии итератора.
+    """
+    import main
+    monkeypatch.setattr(main, 'WARNING_BATCH_SIZE', 2)
+    rows = [
+        [b'A', b'HR', b'x', b'1'],
+        [b'B', b'HR', b'y', b'1'],
+        [b'C', b'HR', b'1', b'1'],
+        [b'D', b'HR', b'z', b'1'],
+        [b'E', b'HR', b'1', b'1'],
+    ]
+    valid = iter_valid_rows(rows, (0, 1, 2, 3))
+    assert next(valid)[0] == 'C'
+    assert "Строка 2 " in capsys.readouterr().out
+    assert next(valid)[0] == 'E'
+    valid.close()
+    assert "Строка 5 " in capsys.readouterr().out
+
+
+def test_rates_beyond_cache_size_are_parsed(monkeypatch):
+    """
+    Проверяет, что ставки сверх размера кэша по-прежнему разбираются корректно.
+    """
+    import main
+    monkeypatch.setattr(main, 'RATE_CACHE_SIZE', 2)
+    rows = [[b'A', b'HR', b'1', str(rate).encode('utf-8')] for rate in (10, 20, 30, 10, 40)]
+    assert [rate for *_, rate in iter_valid_rows(rows, (0, 1, 2, 3))] == [10.0, 20.0, 30.0, 10.0, 40.0]
+
+
+def test_aggregate_file_rates(tmp_path):
+    """
+    Проверяет потоковую агрегацию ставок по отделам с пропуском некорректных строк.
+    """
+    file = tmp_path / "rates.csv"
+    file.write_text(
+        "id,email,name,department,hours_worked,rate\n"
+        "1,test,Alice,HR,40,50\n"
+        "2,test,Bob,HR,35,60\n"
+        "3,test,Carol,Sales,30,-1\n"
+        "4,test,Dave,Sales,30,70\n"
+    )
+    sums, counts = aggregate_file_rates(str(file), RATE_COLUMNS)
+    assert dict(sums) == {'HR': 110.0, 'Sales': 70.0}
+    assert dict(counts) == {'HR': 2, 'Sales': 1}
+
+
+@pytest.mark.skipif(not hasattr(os, 'mkfifo'), reason="именованные каналы недоступны")
+def test_read_from_pipe(tmp_path):
+    """
+    Проверяет чтение из именованного канала, для которого mmap недоступен.
+    """
+    import threading
+
+    fifo = tmp_path / "data.fifo"
+    os.mkfifo(fifo)
+
+    def writer():
+        with open(fifo, 'w') as f:
+            f.write("id,email,name,department,hours_worked,rate\n1,test,Alice,HR,40,50\n2,test,Bob,HR,35,60")
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    records = read_and_validate_file(str(fifo), RATE_COLUMNS)
+    thread.join()
+    assert records.names == ['Alice', 'Bob']
+    assert list(records.payout) == [2000.0, 2100.0]
 
 
 def test_generate_payout_report_output_formatting(capsys):
     """
     Проверяет форматирование вывода отчета о выплатах.
     """
-    records = [
-        {'name': 'Alice', 'department': 'HR', 'hours': 40, 'rate': 50, 'payout': 2000},
-        {'name': 'Bob', 'department': 'HR', 'hours': 35, 'rate': 60, 'payout': 2100}
-    ]
+    records = make_records(('Alice', 'HR', 40, 50), ('Bob', 'HR', 35, 60))
     generate_payout_report(records)
     captured = capsys.readouterr()
     assert "HR" in captured.out
@@ -67,16 +224,23 @@ def test_generate_payout_report_output_formatting(capsys):
     assert "$2100" in captured.out
 
 
+def test_generate_payout_report_column_alignment(capsys):
+    """
+    Проверяет, что ширина столбцов считается по фактически выводимым значениям.
+    """
+    records = make_records(('Al', 'HR', 1234.5, 10))
+    generate_payout_report(records)
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[2] == "name\thours \trate\tpayout"
+    assert lines[3] == "----\t------\t----\t------"
+    assert lines[4] == "Al  \t1234.5\t10.0\t$12345"
+
+
 def test_generate_mean_rate_report_output(capsys):
     """
     Проверяет корректность расчета и вывода среднего значения ставки по отделам.
     """
-    records = [
-        {'name': 'Alice', 'department': 'HR', 'hours': 40, 'rate': 50, 'payout': 2000},
-        {'name': 'Bob', 'department': 'HR', 'hours': 35, 'rate': 60, 'payout': 2100},
-        {'name': 'Charlie', 'department': 'Sales', 'hours': 38, 'rate': 70, 'payout': 2660}
-    ]
-    generate_mean_rate_report(records)
+    generate_mean_rate_report({'HR': 110.0, 'Sales': 70.0}, {'HR': 2, 'Sales': 1})
     captured = capsys.readouterr()
     assert "HR" in captured.out
     assert "Sales" in captured.out
@@ -84,9 +248,62 @@ def test_generate_mean_rate_report_output(capsys):
     assert "70.00" in captured.out
 
 
+def test_records_extend_recodes_departments():
+    """
+    Проверяет, что при объединении наборов записей коды отделов перекодируются в общий словарь.
+    """
+    first = make_records(('Alice', 'HR', 40, 50))
+    second = make_records(('Bob', 'Sales', 35, 60), ('Carol', 'HR', 30, 70))
+
+    first.extend(second)
+
+    assert first.departments == ['HR', 'Sales']
+    assert list(first.dept_codes) == [0, 1, 0]
+    assert list(first.payout) == [2000.0, 2100.0, 2100.0]
+
+
 from main import main as main_func
 
 
+def test_main_mean_rate_multiple_files(monkeypatch, capsys, tmp_path):
+    """
+    Проверяет объединение частичных агрегатов нескольких файлов, обработанных параллельно.
+    """
+    first = tmp_path / "first.csv"
+    first.write_text("id,email,name,department,hours_worked,rate\n1,test,Alice,HR,40,50\n")
+    second = tmp_path / "second.csv"
+    second.write_text("department,id,email,name,hours_worked,salary\nHR,2,test,Bob,35,60\nSales,3,test,Carol,30,70\n")
+
+    monkeypatch.setattr(sys, 'argv', ['main.py', str(first), str(second), '--report', 'mean_rate_department'])
+    main_func()
+    out = capsys.readouterr().out
+    assert "HR        \t55.00" in out
+    assert "Sales     \t70.00" in out
+
+
+def test_main_parallel_warnings_in_file_order(monkeypatch, capsys, tmp_path):
+    """
+    Проверяет, что предупреждения файлов, обработанных в нескольких процессах,
+    выводятся в порядке перечисления файлов.
+    """
+    big = tmp_path / "big.csv"
+    big.write_text(
+        "id,email,name,department,hours_worked,rate\n"
+        + "".join(f"{i},test,Name{i},HR,40,50\n" for i in range(20000))
+        + "x,test,Bad,HR,forty,50\n"
+    )
+    small = tmp_path / "small.csv"
+    small.write_text("id,email,name,department,hours_worked,rate\n1,test,Bad,HR,forty,50\n")
+
+    monkeypatch.setattr(os, 'cpu_count', lambda: 2)
+    monkeypatch.setattr(sys, 'argv', ['main.py', str(big), str(small), '--report', 'mean_rate_department'])
+    main_func()
+    out = capsys.readouterr().out
+    assert "Строка 20002 содержит некорректные данные" in out
+    assert "Строка 2 содержит некорректные данные" in out
+    assert out.index("Строка 20002 ") < out.index("Строка 2 ") < out.index("Department")
+
+
 def test_main_unknown_report(monkeypatch, capsys, tmp_path):
     """
     Проверяет поведение при передаче неподдерживаемого типа отчета.